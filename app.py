@@ -1,33 +1,68 @@
-from flask import Flask, render_template_string, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request, send_from_directory
+from flask.json.provider import JSONProvider
 from datetime import datetime, timedelta
 import json
+import logging
+import logging.handlers
 import os
+import re
+import sys
 import sqlite3
-from collections import defaultdict
-import statistics
+from collections import defaultdict, OrderedDict
 import threading
 import time
+import queue
+import random
 from functools import wraps
+import atexit
 import hashlib
+import calendar
+import gzip
+import array
 import secrets
+import orjson
+
+# ============ Logging ============
+# Request threads only enqueue log records; the listener thread does the writes
+_log_queue = queue.Queue(-1)
+logger = logging.getLogger("soil_monitor")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 # ============ Configuration ============
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 DB_PATH = os.path.join(BASE_DIR, "temperature_data.db")
+VENDOR_DIR = os.path.join(BASE_DIR, "static", "vendor")
+SCHEMA_VERSION = 3  # stored in PRAGMA user_version
 
 def _load_or_create_secret(env_var, file_name, length=32):
     value = os.environ.get(env_var)
     if value:
         return value.strip()
     path = os.path.join(BASE_DIR, file_name)
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            existing = f.read().strip()
-            if existing:
-                return existing
+    # Never follow a symlink planted in place of a secret file
+    nofollow = getattr(os, "O_NOFOLLOW", 0)
+    try:
+        fd = os.open(path, os.O_RDONLY | nofollow)
+    except FileNotFoundError:
+        pass
+    else:
+        try:
+            existing = os.read(fd, 512).decode("utf-8").strip()
+        finally:
+            os.close(fd)
+        if existing:
+            return existing
     generated = secrets.token_urlsafe(length)
-    with open(path, "w", encoding="utf-8") as f:
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | nofollow, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
         f.write(generated)
     try:
         os.chmod(path, 0o600)
@@ -35,16 +70,81 @@ def _load_or_create_secret(env_var, file_name, length=32):
         pass
     return generated
 
+# Front-end assets: served from VENDOR_DIR when a local copy exists, else from the CDN
+VENDOR_ASSETS = {
+    "chart_js": ("chart.js/chart.umd.min.js",
+                 "https://cdn.jsdelivr.net/npm/chart.js@4.4.3/dist/chart.umd.min.js"),
+    "font_awesome": ("fontawesome/css/all.min.css",
+                     "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css"),
+}
+
+def _vendor_url(local_path, cdn_url):
+    """URL for a vendored asset, with its content hash in the path so it can be cached forever"""
+    try:
+        with open(os.path.join(VENDOR_DIR, local_path), "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    except OSError:
+        return cdn_url
+    return f"/static/vendor/{digest}/{local_path}"
+
+ASSET_URLS = {name: _vendor_url(*spec) for name, spec in VENDOR_ASSETS.items()}
+
+def _sha256(value):
+    return hashlib.sha256(value.encode("utf-8")).digest()
+
+# Credentials are only kept as SHA-256 digests so every check compares 32 bytes
 SECRET_KEY = _load_or_create_secret("SOIL_MONITOR_SECRET_KEY", ".secret_key", 32)
-INGEST_TOKEN = _load_or_create_secret("SOIL_MONITOR_INGEST_TOKEN", ".ingest_token", 32)
+INGEST_TOKEN_DIGEST = _sha256(_load_or_create_secret("SOIL_MONITOR_INGEST_TOKEN", ".ingest_token", 32))
 DASHBOARD_USER = os.environ.get("SOIL_MONITOR_USER", "admin")
-DASHBOARD_PASSWORD = _load_or_create_secret("SOIL_MONITOR_PASSWORD", ".dashboard_password", 24)
+DASHBOARD_USER_DIGEST = _sha256(DASHBOARD_USER)
+DASHBOARD_PASSWORD_DIGEST = _sha256(_load_or_create_secret("SOIL_MONITOR_PASSWORD", ".dashboard_password", 24))
 INGEST_TOKEN_HEADER = "X-INGEST-TOKEN"
+AUTH_CACHE_TTL = 60  # seconds
+AUTH_CACHE_MAX_ENTRIES = 128
+WRITE_BATCH_SIZE = 64
+WRITE_BATCH_WINDOW = 0.2  # seconds
+MAX_CHART_POINTS = 10000
+
+# Debug fields are stored as sent, except the boolean flags the ESP32 sends as 'true'/'false'
+_DEBUG_KEYS = ('wake_cause', 'wake_cause_name', 'reset_reason', 'reset_reason_name',
+               'boot_count', 'last_boot_count')
+_BOOL_KEYS = ('probe_mode_completed', 'should_run_probe', 'probe_done_this_cycle',
+              'rtc_sleep_armed', 'unsafe_wake')
+_NO_DEBUG = (None,) * (len(_DEBUG_KEYS) + len(_BOOL_KEYS))
+_READING_COLUMNS = ('timestamp', 't1', 't2', 't3', 'battery', 'battery_status') + _DEBUG_KEYS + _BOOL_KEYS
+# ESP32 timestamps that already match the stored 'YYYY-MM-DD HH:MM:SS' layout, with
+# month, day, hour, minute and second range-checked (days past 28 are checked per month)
+_DEVICE_TIMESTAMP_RE = re.compile(
+    r"((?!0000)[0-9]{4})-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])"
+    r"[T ]([01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]"
+)
+INSERT_SQL = (
+    f"INSERT INTO temperature_readings ({', '.join(_READING_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_READING_COLUMNS))})"
+)
+
+DB_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Queries bind pre-formatted strings; this only catches stray datetime parameters
+sqlite3.register_adapter(datetime, lambda value: value.strftime(DB_TIMESTAMP_FORMAT))
+# Chart x values are the stored wall-clock time read as if it were UTC, in epoch
+# milliseconds, so the browser formats them back without a timezone shift.
+# Computed in SQL so the row loop stays free of datetime; malformed values give NULL.
+TS_MS_SQL = "CAST(ROUND((julianday(timestamp) - 2440587.5) * 86400000) AS INTEGER)"
+
+_tls = threading.local()
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH, timeout=5)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA busy_timeout=5000")
+    """Return this thread's SQLite connection, opening it on first use"""
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=5, check_same_thread=False, isolation_level=None,
+                               cached_statements=128)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        _tls.conn = conn
     return conn
 
 # ============ Database Setup ============
@@ -81,51 +181,105 @@ def init_database():
         CREATE INDEX IF NOT EXISTS idx_timestamp ON temperature_readings(timestamp)
     ''')
     
-    # Add battery columns if they don't exist (for existing databases)
-    try:
-        cursor.execute('ALTER TABLE temperature_readings ADD COLUMN battery REAL')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
+    # Migrations below only run on databases older than SCHEMA_VERSION
+    cursor.execute("PRAGMA user_version")
+    schema_version = cursor.fetchone()[0]
     
-    try:
-        cursor.execute('ALTER TABLE temperature_readings ADD COLUMN battery_status TEXT')
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Add debug columns if they don't exist
-    debug_columns = [
-        ('wake_cause', 'INTEGER'),
-        ('wake_cause_name', 'TEXT'),
-        ('reset_reason', 'INTEGER'),
-        ('reset_reason_name', 'TEXT'),
-        ('boot_count', 'INTEGER'),
-        ('last_boot_count', 'INTEGER'),
-        ('probe_mode_completed', 'BOOLEAN'),
-        ('should_run_probe', 'BOOLEAN'),
-        ('probe_done_this_cycle', 'BOOLEAN'),
-        ('rtc_sleep_armed', 'BOOLEAN'),
-        ('unsafe_wake', 'BOOLEAN')
-    ]
-    
-    for column_name, column_type in debug_columns:
+    if schema_version < 1:
+        # Add battery columns if they don't exist (for existing databases)
+        try:
+            cursor.execute('ALTER TABLE temperature_readings ADD COLUMN battery REAL')
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
         try:
-            cursor.execute(f'ALTER TABLE temperature_readings ADD COLUMN {column_name} {column_type}')
+            cursor.execute('ALTER TABLE temperature_readings ADD COLUMN battery_status TEXT')
         except sqlite3.OperationalError:
             pass  # Column already exists
+        
+        # Add debug columns if they don't exist
+        debug_columns = [
+            ('wake_cause', 'INTEGER'),
+            ('wake_cause_name', 'TEXT'),
+            ('reset_reason', 'INTEGER'),
+            ('reset_reason_name', 'TEXT'),
+            ('boot_count', 'INTEGER'),
+            ('last_boot_count', 'INTEGER'),
+            ('probe_mode_completed', 'BOOLEAN'),
+            ('should_run_probe', 'BOOLEAN'),
+            ('probe_done_this_cycle', 'BOOLEAN'),
+            ('rtc_sleep_armed', 'BOOLEAN'),
+            ('unsafe_wake', 'BOOLEAN')
+        ]
+        
+        for column_name, column_type in debug_columns:
+            try:
+                cursor.execute(f'ALTER TABLE temperature_readings ADD COLUMN {column_name} {column_type}')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+    
+    if schema_version < 2:
+        # Latest reading that carried debug data (/api/debug)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_wake_cause_ts ON temperature_readings(timestamp DESC)
+            WHERE wake_cause IS NOT NULL
+        ''')
+        
+        # Covers the /api/data columns so recent readings never touch the table
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_recent_cover
+            ON temperature_readings(timestamp DESC, t1, t2, t3, battery, battery_status)
+        ''')
+        
+        cursor.execute("ANALYZE")
+    
+    if schema_version < 3:
+        # One partial covering index per sensor for the /api/stats queries
+        for sensor in ('t1', 't2', 't3'):
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_{sensor}_notnull ON temperature_readings(timestamp, {sensor})
+                WHERE {sensor} IS NOT NULL
+            ''')
+        cursor.execute("ANALYZE")
     
-    conn.commit()
-    conn.close()
+    if schema_version < SCHEMA_VERSION:
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    cursor.close()
+
+def _is_sqlite_scalar(value):
+    """True for values SQLite can store as-is: None, str, float or an int within 64 bits"""
+    if value is None or isinstance(value, (str, float)):
+        return True
+    return isinstance(value, int) and -2**63 <= value < 2**63
 
 # ============ Authentication ============
+# SHA-256 of the Authorization header -> monotonic time it last passed check_auth.
+# Keyed on the digest so base64 credentials are never kept in memory.
+_auth_cache = {}
+_auth_cache_lock = threading.Lock()
+
+def _remember_auth(header_digest, now):
+    with _auth_cache_lock:
+        _auth_cache.pop(header_digest, None)
+        _auth_cache[header_digest] = now
+        if len(_auth_cache) > AUTH_CACHE_MAX_ENTRIES:
+            del _auth_cache[next(iter(_auth_cache))]
+
 def require_auth(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        auth = request.authorization
-        if not auth or not check_auth(auth.username, auth.password):
-            response = jsonify({'error': 'Authentication required'})
-            response.status_code = 401
-            response.headers["WWW-Authenticate"] = 'Basic realm="Soil Monitor"'
-            return response
+        header_digest = _sha256(request.headers.get("Authorization", ""))
+        now = time.monotonic()
+        validated_at = _auth_cache.get(header_digest)
+        if validated_at is None or now - validated_at >= AUTH_CACHE_TTL:
+            auth = request.authorization
+            if not auth or not check_auth(auth.username, auth.password):
+                response = jsonify({'error': 'Authentication required'})
+                response.status_code = 401
+                response.headers["WWW-Authenticate"] = 'Basic realm="Soil Monitor"'
+                return response
+            _remember_auth(header_digest, now)
         return f(*args, **kwargs)
     return decorated_function
 
@@ -133,158 +287,369 @@ def require_ingest_token(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         supplied = request.headers.get(INGEST_TOKEN_HEADER, "")
-        if not supplied or not secrets.compare_digest(supplied, INGEST_TOKEN):
+        if not supplied or not secrets.compare_digest(_sha256(supplied), INGEST_TOKEN_DIGEST):
             return jsonify({'error': 'Valid ingest token required'}), 401
         return f(*args, **kwargs)
     return decorated_function
 
 def check_auth(username, password):
-    user = username or ""
-    pwd = password or ""
-    return secrets.compare_digest(user, DASHBOARD_USER) and secrets.compare_digest(pwd, DASHBOARD_PASSWORD)
+    user = _sha256(username or "")
+    pwd = _sha256(password or "")
+    return secrets.compare_digest(user, DASHBOARD_USER_DIGEST) and secrets.compare_digest(pwd, DASHBOARD_PASSWORD_DIGEST)
 
 # ============ Data Management ============
 class TemperatureDataManager:
     def __init__(self):
-        self.cache = {}
+        self.cache = OrderedDict()
         self.cache_timeout = 60  # seconds
+        self.cache_max_entries = 32
+        self._cache_lock = threading.Lock()
+        # Striped so only one thread recomputes a given key at a time
+        self._refresh_locks = [threading.Lock() for _ in range(16)]
+        # Bumped after every committed write; part of every cache key
+        self._data_version = 0
         init_database()
+        self._write_q = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def writer_status(self):
+        """Whether the background writer is alive, and how many readings await it"""
+        return self._writer.is_alive(), self._write_q.qsize()
+    
+    def close(self):
+        """Stop the writer after it has flushed every queued reading"""
+        self._write_q.put(None)
+        self._writer.join(timeout=10)
     
     def add_reading(self, t1, t2, t3, battery=None, battery_status=None, timestamp=None, debug_data=None):
-        """Add new temperature reading to database"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        """Queue a new temperature reading for the background writer"""
+        if debug_data:
+            debug_values = (tuple(debug_data.get(key) for key in _DEBUG_KEYS)
+                            + tuple(debug_data.get(key) == 'true' for key in _BOOL_KEYS))
+        else:
+            debug_values = _NO_DEBUG
         
-        # Extract debug data
-        wake_cause = debug_data.get('wake_cause') if debug_data else None
-        wake_cause_name = debug_data.get('wake_cause_name') if debug_data else None
-        reset_reason = debug_data.get('reset_reason') if debug_data else None
-        reset_reason_name = debug_data.get('reset_reason_name') if debug_data else None
-        boot_count = debug_data.get('boot_count') if debug_data else None
-        last_boot_count = debug_data.get('last_boot_count') if debug_data else None
-        probe_mode_completed = debug_data.get('probe_mode_completed') == 'true' if debug_data else None
-        should_run_probe = debug_data.get('should_run_probe') == 'true' if debug_data else None
-        probe_done_this_cycle = debug_data.get('probe_done_this_cycle') == 'true' if debug_data else None
-        rtc_sleep_armed = debug_data.get('rtc_sleep_armed') == 'true' if debug_data else None
-        unsafe_wake = debug_data.get('unsafe_wake') == 'true' if debug_data else None
+        # Checked here so a bad value fails its own request instead of the writer's batch
+        for name, value in zip(('battery', 'battery_status') + _DEBUG_KEYS, (battery, battery_status) + debug_values):
+            if not _is_sqlite_scalar(value):
+                raise ValueError(f"Unsupported value for {name}: {value!r}")
         
-        cursor.execute('''
-            INSERT INTO temperature_readings (timestamp, t1, t2, t3, battery, battery_status,
-                wake_cause, wake_cause_name, reset_reason, reset_reason_name, boot_count, 
-                last_boot_count, probe_mode_completed, should_run_probe, probe_done_this_cycle,
-                rtc_sleep_armed, unsafe_wake)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (self._format_timestamp(timestamp), t1, t2, t3, battery, battery_status,
-              wake_cause, wake_cause_name, reset_reason, reset_reason_name, boot_count,
-              last_boot_count, probe_mode_completed, should_run_probe, probe_done_this_cycle,
-              rtc_sleep_armed, unsafe_wake))
+        self._write_q.put((self._format_timestamp(timestamp), t1, t2, t3, battery, battery_status) + debug_values)
+
+    def bulk_insert(self, rows, timestamp=None):
+        """Insert (t1, t2, t3, battery, battery_status) rows in one transaction"""
+        timestamp = self._format_timestamp(timestamp)
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(INSERT_SQL, [(timestamp,) + tuple(row) + _NO_DEBUG for row in rows])
+            cursor.execute("COMMIT")
+            self._data_version += 1
+        except sqlite3.Error:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+
+    def _writer_loop(self):
+        """Drain queued readings and insert them in batched transactions until close()"""
+        stopping = False
+        while not stopping:
+            rows = [self._write_q.get()]
+            if rows[0] is None:
+                break
+            deadline = time.monotonic() + WRITE_BATCH_WINDOW
+            while len(rows) < WRITE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = self._write_q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if row is None:
+                    # close(): write what we have, then stop
+                    stopping = True
+                    break
+                rows.append(row)
+            
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            try:
+                if len(rows) == 1:
+                    # A lone INSERT commits by itself in autocommit mode
+                    cursor.execute(INSERT_SQL, rows[0])
+                else:
+                    cursor.execute("BEGIN IMMEDIATE")
+                    cursor.executemany(INSERT_SQL, rows)
+                    cursor.execute("COMMIT")
+            except Exception as e:
+                # Anything, not just sqlite3.Error: the writer must outlive a bad batch
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                if len(rows) == 1:
+                    logger.error("Error writing reading: %s", e)
+                else:
+                    # Retry row by row so one bad reading doesn't drop the good ones
+                    logger.warning("Error writing %d readings: %s; retrying one at a time", len(rows), e)
+                    for row in rows:
+                        try:
+                            cursor.execute(INSERT_SQL, row)
+                        except Exception as e:
+                            logger.error("Error writing reading from %s: %s", row[0], e)
+            finally:
+                self._data_version += 1
+                cursor.close()
+
+    def _cache_get(self, key, now):
+        """Return a fresh (data, stored_at) entry, marking it recently used, or None"""
+        with self._cache_lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            if now - entry[1] >= self.cache_timeout:
+                del self.cache[key]
+                return None
+            self.cache.move_to_end(key)
+            return entry
+
+    def _cache_put(self, key, data, now):
+        """Store a value, evicting the least recently used entries beyond the cap"""
+        with self._cache_lock:
+            self.cache[key] = (data, now)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_max_entries:
+                self.cache.popitem(last=False)
+
+    def _expires_early(self, stored_at, now):
+        """Probabilistically treat an entry in the last 20% of its TTL as expired (XFetch)"""
+        age = now - stored_at
+        early = self.cache_timeout * 0.8
+        return age > early and random.random() < (age - early) / (self.cache_timeout - early)
+
+    def _cached(self, key, compute):
+        """Return the cached value for key, calling compute() to refresh it"""
+        now = time.time()
+        entry = self._cache_get(key, now)
+        if entry is not None and not self._expires_early(entry[1], now):
+            return entry[0]
         
-        conn.commit()
-        conn.close()
-        self.cache.clear()
+        seen = entry[1] if entry is not None else None
+        with self._refresh_locks[hash(key) % len(self._refresh_locks)]:
+            latest = self._cache_get(key, time.time())
+            if latest is not None and latest[1] != seen:
+                return latest[0]  # Refreshed by another thread while we waited
+            now = time.time()
+            data = compute()
+            self._cache_put(key, data, now)
+            return data
         
 
     def _format_timestamp(self, timestamp):
         """Convert ISO timestamp to database format"""
         if not timestamp or timestamp == "null":
-            print("Using server timestamp (ESP32 sent null)"); return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            logger.info("Using server timestamp (ESP32 sent null)"); return datetime.now().strftime(DB_TIMESTAMP_FORMAT)
+        match = _DEVICE_TIMESTAMP_RE.fullmatch(timestamp) if isinstance(timestamp, str) else None
+        if match and (int(match[3]) <= 28
+                      or int(match[3]) <= calendar.monthrange(int(match[1]), int(match[2]))[1]):
+            return timestamp.replace('T', ' ')
         try:
-            # Parse ISO format (2025-09-11T17:25:05) and convert to database format
+            # Other ISO forms (fractional seconds, no seconds) still go through datetime
             dt = datetime.fromisoformat(timestamp.replace('T', ' '))
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
+            return dt.strftime(DB_TIMESTAMP_FORMAT)
         except Exception:
-            print("Using server timestamp (ESP32 sent null)"); return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            logger.info("Using server timestamp (ESP32 sent null)"); return datetime.now().strftime(DB_TIMESTAMP_FORMAT)
     
-    def get_recent_readings(self, hours=24, limit=1000):
-        """Get recent temperature readings with caching"""
-        cache_key = f"recent_{hours}_{limit}"
-        now = time.time()
-        
-        if cache_key in self.cache:
-            data, timestamp = self.cache[cache_key]
-            if now - timestamp < self.cache_timeout:
-                return data
-        
+    def get_recent_readings(self, hours=24, limit=1000, encode=None):
+        """Get (recent readings, last id) with caching, optionally cached as encode(readings)"""
+        cache_key = ("recent", hours, limit, encode, self._data_version)
+        return self._cached(cache_key, lambda: self._snapshot(
+            lambda: self._query_recent_readings(hours, limit), encode))
+    
+    def _snapshot(self, query, encode):
+        """Run query() in one read transaction alongside the highest id it could see"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        # In WAL mode the transaction pins one snapshot, so no row committed after
+        # MAX(id) is read can appear in the window (and be fetched twice by since_id)
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute("SELECT MAX(id) FROM temperature_readings")
+            last_id = cursor.fetchone()[0] or 0
+            data = query()
+        finally:
+            cursor.execute("COMMIT")
+            cursor.close()
+        return (data if encode is None else encode(data)), last_id
+    
+    def _query_recent_readings(self, hours, limit):
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        cursor.execute('''
-            SELECT timestamp, t1, t2, t3, battery, battery_status
+        cutoff_time = (datetime.now() - timedelta(hours=hours)).strftime(DB_TIMESTAMP_FORMAT)
+        cursor.execute(f'''
+            SELECT timestamp, t1, t2, t3, battery, battery_status, {TS_MS_SQL}
             FROM temperature_readings
             WHERE timestamp >= ?
             ORDER BY timestamp DESC
             LIMIT ?
         ''', (cutoff_time, limit))
         
-        data = []
-        for row in cursor.fetchall():
-            data.append({
-                'time': datetime.fromisoformat(row[0]).strftime('%H:%M'),
-                'ts': row[0],
-                't1': row[1],
-                't2': row[2],
-                't3': row[3],
-                'battery': row[4],
-                'battery_status': row[5]
-            })
-        
-        conn.close()
-        
-        # Cache the result
-        self.cache[cache_key] = (data, now)
+        data = [self._reading_from_row(row) for row in cursor.fetchall()]
+        cursor.close()
         return data
     
-    def get_statistics(self, hours=24):
-        """Get temperature statistics for the specified period"""
+    def get_readings_since_id(self, since_id, limit=1000):
+        """Get (readings with an id above `since_id` in insert order, last id returned)"""
         conn = get_db_connection()
         cursor = conn.cursor()
-        
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        cursor.execute('''
-            SELECT t1, t2, t3, timestamp
+        # Ids follow commit order, unlike device timestamps, so late or same-second
+        # readings are never skipped
+        cursor.execute(f'''
+            SELECT timestamp, t1, t2, t3, battery, battery_status, {TS_MS_SQL}, id
             FROM temperature_readings
-            WHERE timestamp >= ?
+            WHERE id > ?
+            ORDER BY id ASC
+            LIMIT ?
+        ''', (since_id, limit))
+        rows = cursor.fetchall()
+        cursor.close()
+        return [self._reading_from_row(row) for row in rows], (rows[-1][7] if rows else since_id)
+    
+    def get_readings_since(self, since, limit=1000):
+        """Get readings newer than the `since` timestamp, oldest first"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT timestamp, t1, t2, t3, battery, battery_status, {TS_MS_SQL}
+            FROM temperature_readings
+            WHERE timestamp > ?
             ORDER BY timestamp ASC
+            LIMIT ?
+        ''', (since, limit))
+        data = [self._reading_from_row(row) for row in cursor.fetchall()]
+        cursor.close()
+        return data
+    
+    def get_downsampled_readings(self, hours=24, points=1000, encode=None):
+        """Get (the whole window oldest-first, M4-downsampled to about `points` buckets, last id)"""
+        cache_key = ("m4", hours, points, encode, self._data_version)
+        return self._cached(cache_key, lambda: self._snapshot(
+            lambda: self._query_downsampled_readings(hours, points), encode))
+    
+    def _query_downsampled_readings(self, hours, points):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cutoff_time = (datetime.now() - timedelta(hours=hours)).strftime(DB_TIMESTAMP_FORMAT)
+        cursor.execute('''
+            SELECT COUNT(*) FROM temperature_readings WHERE timestamp >= ?
         ''', (cutoff_time,))
         
-        data = cursor.fetchall()
-        conn.close()
+        if cursor.fetchone()[0] <= 4 * points:
+            # Already within the pixel budget; send every reading
+            cursor.execute(f'''
+                SELECT timestamp, t1, t2, t3, battery, battery_status, {TS_MS_SQL}
+                FROM temperature_readings
+                WHERE timestamp >= ?
+                ORDER BY timestamp ASC
+            ''', (cutoff_time,))
+        else:
+            # M4 per sensor: keep the first, last, min and max non-NULL reading of each
+            # sensor per bucket, so up to 12 rows per bucket (12 * points in total).
+            # A lone MIN()/MAX() makes SQLite report the id of the row holding it.
+            picks = " UNION ".join(
+                f"SELECT id FROM (SELECT {agg}({col}), id FROM bucketed"
+                f" WHERE {sensor} IS NOT NULL GROUP BY bucket)"
+                for sensor in ('t1', 't2', 't3')
+                for col in ('timestamp', sensor)
+                for agg in ('MIN', 'MAX')
+            )
+            cursor.execute(f'''
+                WITH bucketed AS (
+                    SELECT id, timestamp, t1, t2, t3,
+                           CAST((julianday(timestamp) - julianday(:cutoff)) * :buckets_per_day AS INTEGER) AS bucket
+                    FROM temperature_readings
+                    WHERE timestamp >= :cutoff
+                )
+                SELECT timestamp, t1, t2, t3, battery, battery_status, {TS_MS_SQL}
+                FROM temperature_readings
+                WHERE id IN ({picks})
+                ORDER BY timestamp ASC
+            ''', {'cutoff': cutoff_time, 'buckets_per_day': points * 24 / hours})
         
-        if not data:
-            return {'t1': None, 't2': None, 't3': None}
+        data = [self._reading_from_row(row) for row in cursor.fetchall()]
+        cursor.close()
+        return data
+    
+    @staticmethod
+    def _reading_from_row(row):
+        return {
+            'time': row[0][11:16],
+            'ts': row[0],
+            'ts_ms': row[6],
+            't1': row[1],
+            't2': row[2],
+            't3': row[3],
+            'battery': row[4],
+            'battery_status': row[5]
+        }
+    
+    def get_statistics(self, hours=24):
+        """Get temperature statistics for the specified period"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
         
+        cutoff_time = (datetime.now() - timedelta(hours=hours)).strftime(DB_TIMESTAMP_FORMAT)
         stats = {}
-        for sensor in ['t1', 't2', 't3']:
-            values = [row[0] if sensor == 't1' else row[1] if sensor == 't2' else row[2] 
-                     for row in data if row[0] is not None or row[1] is not None or row[2] is not None]
-            
-            # Filter out None values
-            values = [v for v in values if v is not None]
-            
-            if values:
-                min_val = min(values)
-                max_val = max(values)
-                avg_val = statistics.mean(values)
-                
-                # Find timestamps for min/max
-                min_time = next(row[3] for row in data if (row[0] if sensor == 't1' else row[1] if sensor == 't2' else row[2]) == min_val)
-                max_time = next(row[3] for row in data if (row[0] if sensor == 't1' else row[1] if sensor == 't2' else row[2]) == max_val)
-                
-                stats[sensor] = {
-                    'min': {'val': min_val, 'time': datetime.fromisoformat(min_time).strftime('%H:%M')},
-                    'max': {'val': max_val, 'time': datetime.fromisoformat(max_time).strftime('%H:%M')},
-                    'avg': round(avg_val, 2),
-                    'current': values[-1] if values else None
-                }
-            else:
+        for sensor in ('t1', 't2', 't3'):
+            # Each sensor is read from its own partial index, so NULLs never reach Python.
+            # With a single MIN()/MAX() per subquery, SQLite takes the bare timestamp
+            # from the row holding that extreme (the earliest one on ties), so the
+            # extremes and their times come out of the aggregate passes themselves.
+            cursor.execute(f'''
+                SELECT lo.val, lo.ts, lo.mean, hi.val, hi.ts,
+                       (SELECT {sensor} FROM temperature_readings
+                        WHERE {sensor} IS NOT NULL AND timestamp >= :cutoff
+                        ORDER BY timestamp DESC LIMIT 1)
+                FROM (SELECT MIN({sensor}) AS val, timestamp AS ts, AVG({sensor}) AS mean
+                      FROM temperature_readings
+                      WHERE {sensor} IS NOT NULL AND timestamp >= :cutoff) AS lo,
+                     (SELECT MAX({sensor}) AS val, timestamp AS ts
+                      FROM temperature_readings
+                      WHERE {sensor} IS NOT NULL AND timestamp >= :cutoff) AS hi
+            ''', {'cutoff': cutoff_time})
+            min_val, min_time, avg_val, max_val, max_time, current = cursor.fetchone()
+            if min_val is None:
                 stats[sensor] = None
+                continue
+            
+            stats[sensor] = {
+                'min': {'val': min_val, 'time': datetime.fromisoformat(min_time).strftime('%H:%M')},
+                'max': {'val': max_val, 'time': datetime.fromisoformat(max_time).strftime('%H:%M')},
+                'avg': round(avg_val, 2),
+                'current': current
+            }
         
+        cursor.close()
         return stats
 
 # ============ Flask App ============
+class OrjsonProvider(JSONProvider):
+    """Serve jsonify() and request JSON through orjson"""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
+app.json = OrjsonProvider(app)
 
 data_manager = TemperatureDataManager()
 
@@ -294,7 +659,7 @@ data_manager = TemperatureDataManager()
 def submit():
     """Receive temperature data from ESP32"""
     try:
-        data = request.get_json(force=True)
+        data = orjson.loads(request.get_data(cache=False))
         
         # Validate temperature values
         t1 = validate_temp(data.get("t1"))
@@ -310,7 +675,7 @@ def submit():
         
         if t1 is not None or t2 is not None or t3 is not None:
             data_manager.add_reading(t1, t2, t3, battery, battery_status, data.get("ts"), debug_data)
-            return jsonify({"status": "ok", "message": "Data recorded successfully"}), 200
+            return jsonify({"status": "ok", "message": "Data queued for recording"}), 200
         else:
             return jsonify({"status": "error", "message": "No valid temperature data"}), 400
             
@@ -322,17 +687,17 @@ def submit():
 def battery_alert():
     """Receive battery alerts from ESP32"""
     try:
-        data = request.get_json(force=True)
+        data = orjson.loads(request.get_data(cache=False))
         
         alert_type = data.get("alert")
         battery_voltage = data.get("battery")
         message = data.get("message")
         
         # Log the alert
-        print(f"🔋 BATTERY ALERT: {alert_type} - {message} (Voltage: {battery_voltage}V)")
+        logger.warning("🔋 BATTERY ALERT: %s - %s (Voltage: %sV)", alert_type, message, battery_voltage)
         
         # You could add email notifications, database logging, etc. here
-        # For now, just log to console and return success
+        # For now, just log it and return success
         
         return jsonify({
             "status": "ok", 
@@ -342,7 +707,7 @@ def battery_alert():
         }), 200
             
     except Exception as e:
-        print(f"Error processing battery alert: {e}")
+        logger.error("Error processing battery alert: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route("/api/data")
@@ -351,9 +716,48 @@ def get_data():
     """Get temperature data with optional filtering"""
     hours = request.args.get('hours', 24, type=int)
     limit = request.args.get('limit', 1000, type=int)
+    # Chart width in device pixels; asks for the whole window downsampled, oldest first
+    points = request.args.get('points', type=int)
+    # Last timestamp the client already has; only newer rows are returned, oldest first
+    since = request.args.get('since')
+    # Last id the client already has (from X-Last-Id); later inserts come back in id order
+    since_id = request.args.get('since_id', type=int)
     
-    data = data_manager.get_recent_readings(hours, limit)
-    return jsonify(data)
+    mimetype = request.accept_mimetypes.best_match(["application/json", "application/octet-stream"])
+    encode = _columnar_bytes if mimetype == "application/octet-stream" else orjson.dumps
+    
+    # Cached windows are stored already encoded, so a cache hit skips serialization
+    last_id = None
+    if since_id is not None:
+        data, last_id = data_manager.get_readings_since_id(since_id, limit)
+        body = encode(data)
+    elif since:
+        body = encode(data_manager.get_readings_since(since, limit))
+    elif points and hours > 0:
+        body, last_id = data_manager.get_downsampled_readings(hours, min(max(points, 10), MAX_CHART_POINTS), encode)
+    else:
+        body, last_id = data_manager.get_recent_readings(hours, limit, encode)
+    response = app.response_class(body, mimetype=mimetype or "application/json")
+    if last_id is not None:
+        response.headers["X-Last-Id"] = str(last_id)
+    if since_id is None and not since and points and hours > 0:
+        # Tells the dashboard the window is already reduced to the requested width
+        response.headers["X-Downsampled"] = "m4"
+    response.vary.add("Accept")
+    return response
+
+def _columnar_bytes(data):
+    """Pack readings as little-endian ts_ms f64[N] | t1 f32[N] | t2 f32[N] | t3 f32[N], NaN for missing"""
+    nan = float("nan")
+    # A row whose stored timestamp did not parse has no x position to plot
+    data = [row for row in data if row['ts_ms'] is not None]
+    columns = [array.array("d", [row['ts_ms'] for row in data])]
+    for sensor in ('t1', 't2', 't3'):
+        columns.append(array.array("f", [nan if row[sensor] is None else row[sensor] for row in data]))
+    if sys.byteorder == "big":
+        for column in columns:
+            column.byteswap()
+    return b"".join(column.tobytes() for column in columns)
 
 @app.route("/api/stats")
 @require_auth
@@ -384,7 +788,7 @@ def get_debug_info():
         ''')
         
         row = cursor.fetchone()
-        conn.close()
+        cursor.close()
         
         if row:
             return jsonify({
@@ -418,14 +822,18 @@ def health_check():
         cursor = conn.cursor()
         cursor.execute("SELECT COUNT(*) FROM temperature_readings")
         count = cursor.fetchone()[0]
-        conn.close()
+        cursor.close()
         
+        # Submissions are only queued, so a dead writer means readings are being lost
+        writer_alive, queued = data_manager.writer_status()
         return jsonify({
-            "status": "healthy",
+            "status": "healthy" if writer_alive else "unhealthy",
             "database": "connected",
+            "writer": "running" if writer_alive else "stopped",
+            "queued_readings": queued,
             "total_readings": count,
             "timestamp": datetime.now().isoformat()
-        })
+        }), 200 if writer_alive else 500
     except Exception as e:
         return jsonify({
             "status": "unhealthy",
@@ -451,9 +859,9 @@ TEMPLATE = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Soil Monitor</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.3/dist/chart.umd.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/date-fns@2.29.3/index.min.js"></script>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
+    <script defer src="{{ asset_urls.chart_js }}"></script>
+    <link rel="preload" as="style" href="{{ asset_urls.font_awesome }}" onload="this.onload=null;this.rel='stylesheet'">
+    <noscript><link href="{{ asset_urls.font_awesome }}" rel="stylesheet"></noscript>
     <style>
         :root {
             --primary-color: #2f855a;
@@ -1034,7 +1442,18 @@ TEMPLATE = """
         let mainChart;
         let currentTheme = 'light';
         let currentTimeRange = 24;
-        let refreshInterval;
+        let refreshTimer = null;
+        let refreshStopped = false;
+        // Fetching, parsing and reducing /api/data happens in a worker
+        const dataWorker = new Worker('/data-worker.js');
+        const pendingLoads = new Map();
+        let nextLoadId = 0;
+        // Reused chart data arrays and {x, y} objects, one set per sensor
+        const chartPoints = [[], [], []];
+        const pointPool = [[], [], []];
+        // Cached statistic and status bar elements, filled in initializeEventListeners
+        const STAT_EL = {};
+        const STATUS_EL = {};
         const COMPOST_ZONES = [
             { min: -20, max: 20, label: 'Cold', color: 'rgba(147, 197, 253, 0.22)' },
             { min: 20, max: 40, label: 'Mesophilic', color: 'rgba(134, 239, 172, 0.20)' },
@@ -1043,29 +1462,60 @@ TEMPLATE = """
             { min: 65, max: 100, label: 'Too Hot', color: 'rgba(252, 165, 165, 0.22)' }
         ];
 
+        // The zone bands only change with the chart area or y range, so they are
+        // rendered once into a bitmap and blitted on every frame
+        function renderCompostZones(chart, width, height) {
+            const y = chart.scales.y;
+            const top = chart.chartArea.top;
+            const dpr = chart.currentDevicePixelRatio || 1;
+            const w = Math.ceil(width * dpr);
+            const h = Math.ceil(height * dpr);
+            let canvas;
+            if (typeof OffscreenCanvas !== 'undefined') {
+                canvas = new OffscreenCanvas(w, h);
+            } else {
+                canvas = document.createElement('canvas');
+                canvas.width = w;
+                canvas.height = h;
+            }
+            const ctx = canvas.getContext('2d');
+            ctx.scale(dpr, dpr);
+            COMPOST_ZONES.forEach(zone => {
+                const yTop = y.getPixelForValue(zone.max) - top;
+                const yBottom = y.getPixelForValue(zone.min) - top;
+                const zoneTop = Math.max(0, Math.min(yTop, yBottom));
+                const zoneBottom = Math.min(height, Math.max(yTop, yBottom));
+                if (zoneBottom <= 0 || zoneTop >= height) return;
+                ctx.fillStyle = zone.color;
+                ctx.fillRect(0, zoneTop, width, zoneBottom - zoneTop);
+            });
+            return canvas.transferToImageBitmap ? canvas.transferToImageBitmap() : canvas;
+        }
+
         const compostZonesPlugin = {
             id: 'compostZones',
             beforeDatasetsDraw(chart) {
                 const { ctx, chartArea, scales } = chart;
                 const y = scales.y;
                 if (!chartArea || !y) return;
-                ctx.save();
-                COMPOST_ZONES.forEach(zone => {
-                    const yTop = y.getPixelForValue(zone.max);
-                    const yBottom = y.getPixelForValue(zone.min);
-                    const top = Math.max(chartArea.top, Math.min(yTop, yBottom));
-                    const bottom = Math.min(chartArea.bottom, Math.max(yTop, yBottom));
-                    if (bottom <= chartArea.top || top >= chartArea.bottom) return;
-                    ctx.fillStyle = zone.color;
-                    ctx.fillRect(chartArea.left, top, chartArea.right - chartArea.left, bottom - top);
-                });
-                ctx.restore();
+                const width = chartArea.right - chartArea.left;
+                const height = chartArea.bottom - chartArea.top;
+                if (width <= 0 || height <= 0) return;
+                const key = `${chartArea.left}|${chartArea.top}|${width}|${height}|${y.min}|${y.max}|${chart.currentDevicePixelRatio}`;
+                if (!chart.$zonesCache || chart.$zonesCache.key !== key) {
+                    if (chart.$zonesCache && chart.$zonesCache.bitmap.close) {
+                        chart.$zonesCache.bitmap.close();
+                    }
+                    chart.$zonesCache = { key, bitmap: renderCompostZones(chart, width, height) };
+                }
+                ctx.drawImage(chart.$zonesCache.bitmap, chartArea.left, chartArea.top, width, height);
             }
         };
-        Chart.register(compostZonesPlugin);
 
-        // Initialize the application
+        // Initialize the application; Chart.js is deferred, so it is only
+        // guaranteed to be loaded once DOMContentLoaded fires
         document.addEventListener('DOMContentLoaded', function() {
+            Chart.register(compostZonesPlugin);
             initializeTheme();
             initializeChart();
             initializeEventListeners();
@@ -1088,6 +1538,30 @@ TEMPLATE = """
             themeIcon.className = theme === 'dark' ? 'fas fa-sun' : 'fas fa-moon';
         }
 
+        // x values are wall-clock epoch ms from the server, so format them in UTC
+        const DAY_MS = 86400000;
+        const TICK_STEPS = [5, 15, 30, 60, 120, 180, 360, 720, 1440].map(m => m * 60000);
+
+        function pad2(n) {
+            return n < 10 ? '0' + n : '' + n;
+        }
+
+        function formatClock(ms) {
+            const d = new Date(ms);
+            return pad2(d.getUTCHours()) + ':' + pad2(d.getUTCMinutes());
+        }
+
+        function formatDay(ms) {
+            const d = new Date(ms);
+            return pad2(d.getUTCDate()) + '/' + pad2(d.getUTCMonth() + 1);
+        }
+
+        function tickStep(hours) {
+            // Aim for about eight ticks on whole clock boundaries
+            const target = hours * 3600000 / 8;
+            return TICK_STEPS.find(step => step >= target) || DAY_MS;
+        }
+
         // Chart initialization
         function initializeChart() {
             const ctx = document.getElementById('mainChart').getContext('2d');
@@ -1095,7 +1569,6 @@ TEMPLATE = """
             mainChart = new Chart(ctx, {
                 type: 'line',
                 data: {
-                    labels: [],
                     datasets: [
                         {
                             label: 'Sensor T1',
@@ -1104,8 +1577,10 @@ TEMPLATE = """
                             backgroundColor: 'rgba(239, 68, 68, 0.1)',
                             borderWidth: 3,
                             pointRadius: 0,
-                            pointHoverRadius: 6,
-                            tension: 0.4,
+                            pointHoverRadius: 0,
+                            pointHitRadius: 0,
+                            tension: 0,
+                            spanGaps: true,
                             fill: false
                         },
                         {
@@ -1115,8 +1590,10 @@ TEMPLATE = """
                             backgroundColor: 'rgba(59, 130, 246, 0.1)',
                             borderWidth: 3,
                             pointRadius: 0,
-                            pointHoverRadius: 6,
-                            tension: 0.4,
+                            pointHoverRadius: 0,
+                            pointHitRadius: 0,
+                            tension: 0,
+                            spanGaps: true,
                             fill: false
                         },
                         {
@@ -1126,8 +1603,10 @@ TEMPLATE = """
                             backgroundColor: 'rgba(16, 185, 129, 0.1)',
                             borderWidth: 3,
                             pointRadius: 0,
-                            pointHoverRadius: 6,
-                            tension: 0.4,
+                            pointHoverRadius: 0,
+                            pointHitRadius: 0,
+                            tension: 0,
+                            spanGaps: true,
                             fill: false
                         }
                     ]
@@ -1135,8 +1614,12 @@ TEMPLATE = """
                 options: {
                     responsive: true,
                     maintainAspectRatio: false,
+                    // Points are pre-parsed {x, y} objects in ascending x order
+                    parsing: false,
+                    normalized: true,
                     interaction: {
-                        mode: 'index',
+                        mode: 'nearest',
+                        axis: 'x',
                         intersect: false
                     },
                     plugins: {
@@ -1161,7 +1644,7 @@ TEMPLATE = """
                             displayColors: true,
                             callbacks: {
                                 title: function(context) {
-                                    return 'Time: ' + context[0].label;
+                                    return 'Time: ' + formatClock(context[0].parsed.x);
                                 },
                                 label: function(context) {
                                     return context.dataset.label + ': ' + context.parsed.y.toFixed(2) + '°C';
@@ -1170,10 +1653,18 @@ TEMPLATE = """
                         },
                         compostZones: {
                             enabled: true
+                        },
+                        // Needs parsing: false and the linear x axis above
+                        decimation: {
+                            enabled: true,
+                            algorithm: 'min-max',
+                            threshold: 1000
                         }
                     },
                     scales: {
                         x: {
+                            type: 'linear',
+                            bounds: 'data',
                             grid: {
                                 color: 'rgba(0, 0, 0, 0.1)',
                                 drawBorder: false
@@ -1182,6 +1673,11 @@ TEMPLATE = """
                                 color: '#6b7280',
                                 font: {
                                     size: 12
+                                },
+                                stepSize: tickStep(currentTimeRange),
+                                includeBounds: false,
+                                callback: function(value) {
+                                    return this.options.ticks.stepSize >= DAY_MS ? formatDay(value) : formatClock(value);
                                 }
                             }
                         },
@@ -1203,9 +1699,28 @@ TEMPLATE = """
                             suggestedMax: 70
                         }
                     },
+                    // Data refreshes redraw instantly (update('none')); only a chart
+                    // type or time range switch, and resizing, animate positions
                     animation: {
-                        duration: 1000,
-                        easing: 'easeInOutQuart'
+                        duration: 0
+                    },
+                    animations: {
+                        colors: false,
+                        x: false,
+                        y: false
+                    },
+                    transitions: {
+                        active: {
+                            animation: { duration: 0 }
+                        },
+                        resize: {
+                            animation: { duration: 300 },
+                            animations: { x: { duration: 300 }, y: { duration: 300 } }
+                        },
+                        switch: {
+                            animation: { duration: 300 },
+                            animations: { x: { duration: 300 }, y: { duration: 300 } }
+                        }
                     }
                 }
             });
@@ -1213,6 +1728,19 @@ TEMPLATE = """
 
         // Event listeners
         function initializeEventListeners() {
+            // Elements refreshed on every load, looked up once
+            ['t1', 't2', 't3'].forEach(sensor => {
+                STAT_EL[sensor] = {
+                    cur: document.getElementById(`${sensor}Current`),
+                    avg: document.getElementById(`${sensor}Avg`),
+                    min: document.getElementById(`${sensor}Min`),
+                    max: document.getElementById(`${sensor}Max`)
+                };
+            });
+            STATUS_EL.avgTemp = document.getElementById('avgTemp');
+            STATUS_EL.stage = document.getElementById('compostStage');
+            STATUS_EL.hint = document.getElementById('compostStageHint');
+
             // Theme toggle
             document.getElementById('themeToggle').addEventListener('click', function() {
                 setTheme(currentTheme === 'light' ? 'dark' : 'light');
@@ -1221,7 +1749,7 @@ TEMPLATE = """
             // Time range selector
             document.getElementById('timeRange').addEventListener('change', function() {
                 currentTimeRange = parseInt(this.value);
-                loadData();
+                loadData(true, 'switch');
             });
 
             // Refresh button
@@ -1242,26 +1770,46 @@ TEMPLATE = """
             });
         }
 
-        // Data loading
-        async function loadData() {
+        // Data loading: a full reload replaces the chart, otherwise the worker
+        // only fetches newer rows and merges them into the window it keeps
+        dataWorker.onmessage = function(event) {
+            const pending = pendingLoads.get(event.data.id);
+            if (!pending) return;
+            pendingLoads.delete(event.data.id);
+            if (event.data.error) {
+                pending.reject(new Error(event.data.error));
+            } else if (event.data.aborted) {
+                // Superseded by a newer full reload
+                pending.resolve(null);
+            } else {
+                pending.resolve(event.data);
+            }
+        };
+
+        function requestData(full) {
+            // Ask the server to downsample to the chart's width in device pixels
+            const width = mainChart.chartArea ? mainChart.chartArea.width : 1000;
+            const points = Math.ceil(width * window.devicePixelRatio);
+            // Client-side LTTB budget for when the server sends raw rows
+            const threshold = Math.max(500, Math.ceil(width * 2));
+            const id = nextLoadId++;
+            return new Promise((resolve, reject) => {
+                pendingLoads.set(id, { resolve, reject });
+                dataWorker.postMessage({ id, hours: currentTimeRange, points, threshold, full });
+            });
+        }
+
+        async function loadData(full = true, mode = 'none') {
             try {
                 showLoading();
-                
-                const [dataResponse, statsResponse] = await Promise.all([
-                    fetch(`/api/data?hours=${currentTimeRange}`),
-                    fetch(`/api/stats?hours=${currentTimeRange}`)
-                ]);
-
-                if (!dataResponse.ok || !statsResponse.ok) {
-                    throw new Error('Failed to fetch data');
-                }
 
-                const data = await dataResponse.json();
-                const stats = await statsResponse.json();
+                const result = await requestData(full);
 
-                updateChart(data);
-                updateStatistics(stats);
-                updateStatusBar(data, stats);
+                if (result) {
+                    updateChart(result, mode);
+                    updateStatistics(result.stats);
+                    updateStatusBar(result.avg);
+                }
                 
                 hideLoading();
             } catch (error) {
@@ -1271,20 +1819,63 @@ TEMPLATE = """
         }
 
         // Chart updates
-        function updateChart(data) {
-            if (!data || data.length === 0) return;
+        function updateChart(series, mode = 'none') {
+            // Pre-parsed points for parsing: false; NaN marks a missing reading.
+            // Point objects are pooled and rewritten in place across refreshes.
+            const n = series.length;
+            const xs = series.ts;
+            const hash = seriesHash(series);
+            if (hash === mainChart.$dataHash) {
+                // Same window as on screen (an idle poll): nothing to redraw
+                recycleSeries(series);
+                return;
+            }
+            mainChart.$dataHash = hash;
+            mainChart.options.scales.x.ticks.stepSize = tickStep(currentTimeRange);
+            [series.t1, series.t2, series.t3].forEach((values, i) => {
+                const pool = pointPool[i];
+                const points = chartPoints[i];
+                while (pool.length < n) pool.push({ x: 0, y: 0 });
+                points.length = n;
+                for (let j = 0; j < n; j++) {
+                    const point = pool[j];
+                    point.x = xs[j];
+                    point.y = values[j];
+                    points[j] = point;
+                }
+                mainChart.data.datasets[i].data = points;
+            });
 
-            const labels = data.map(d => d.time).reverse();
-            const t1Data = data.map(d => d.t1).reverse();
-            const t2Data = data.map(d => d.t2).reverse();
-            const t3Data = data.map(d => d.t3).reverse();
+            mainChart.update(mode);
+            recycleSeries(series);
+        }
 
-            mainChart.data.labels = labels;
-            mainChart.data.datasets[0].data = t1Data;
-            mainChart.data.datasets[1].data = t2Data;
-            mainChart.data.datasets[2].data = t3Data;
+        function recycleSeries(series) {
+            // Hand the typed arrays back for the worker's next refresh
+            const recycle = { ts: series.ts, t1: series.t1, t2: series.t2, t3: series.t3 };
+            dataWorker.postMessage({ recycle }, [recycle.ts.buffer, recycle.t1.buffer, recycle.t2.buffer, recycle.t3.buffer]);
+        }
 
-            mainChart.update('active');
+        // FNV-1a over the raw bits of the window's length, range, both ends and
+        // the last two readings of each sensor
+        const hashFloat = new Float64Array(1);
+        const hashWords = new Uint32Array(hashFloat.buffer);
+
+        function seriesHash(series) {
+            const n = series.length;
+            const last = Math.max(n - 1, 0);
+            const prev = Math.max(n - 2, 0);
+            const values = [n, currentTimeRange, series.ts[0], series.ts[last]];
+            for (const sensor of [series.t1, series.t2, series.t3]) {
+                values.push(sensor[last], sensor[prev]);
+            }
+            let h = 2166136261;
+            for (const v of values) {
+                hashFloat[0] = v;
+                h = Math.imul(h ^ hashWords[0], 16777619);
+                h = Math.imul(h ^ hashWords[1], 16777619);
+            }
+            return h;
         }
 
         function changeChartType(type) {
@@ -1306,81 +1897,75 @@ TEMPLATE = """
                 });
             }
 
-            mainChart.update();
+            mainChart.update('switch');
         }
 
         // Statistics updates
         function updateStatistics(stats) {
             ['t1', 't2', 't3'].forEach(sensor => {
                 const sensorStats = stats[sensor];
+                const el = STAT_EL[sensor];
                 if (sensorStats) {
-                    document.getElementById(`${sensor}Current`).textContent = 
-                        sensorStats.current ? sensorStats.current.toFixed(1) + '°C' : '--';
-                    document.getElementById(`${sensor}Avg`).textContent = 
-                        sensorStats.avg ? sensorStats.avg + '°C' : '--';
-                    document.getElementById(`${sensor}Min`).textContent = 
-                        sensorStats.min ? sensorStats.min.val.toFixed(1) + '°C' : '--';
-                    document.getElementById(`${sensor}Max`).textContent = 
-                        sensorStats.max ? sensorStats.max.val.toFixed(1) + '°C' : '--';
+                    setText(el.cur, sensorStats.current ? sensorStats.current.toFixed(1) + '°C' : '--');
+                    setText(el.avg, sensorStats.avg ? sensorStats.avg + '°C' : '--');
+                    setText(el.min, sensorStats.min ? sensorStats.min.val.toFixed(1) + '°C' : '--');
+                    setText(el.max, sensorStats.max ? sensorStats.max.val.toFixed(1) + '°C' : '--');
                 } else {
-                    document.getElementById(`${sensor}Current`).textContent = '--';
-                    document.getElementById(`${sensor}Avg`).textContent = '--';
-                    document.getElementById(`${sensor}Min`).textContent = '--';
-                    document.getElementById(`${sensor}Max`).textContent = '--';
+                    setText(el.cur, '--');
+                    setText(el.avg, '--');
+                    setText(el.min, '--');
+                    setText(el.max, '--');
                 }
             });
         }
 
         // Status bar updates
-        function updateStatusBar(data, stats) {
-            // Calculate average temperature
-            const allTemps = [];
-            data.forEach(d => {
-                if (d.t1 !== null) allTemps.push(d.t1);
-                if (d.t2 !== null) allTemps.push(d.t2);
-                if (d.t3 !== null) allTemps.push(d.t3);
-            });
-            
-            if (allTemps.length > 0) {
-                const avg = allTemps.reduce((a, b) => a + b, 0) / allTemps.length;
-                document.getElementById('avgTemp').textContent = avg.toFixed(1) + '°C';
+        function updateStatusBar(avg) {
+            // The worker averages every charted reading across all sensors
+            if (avg !== null) {
+                setText(STATUS_EL.avgTemp, avg.toFixed(1) + '°C');
                 updateCompostStage(avg);
             } else {
-                document.getElementById('avgTemp').textContent = '--';
+                setText(STATUS_EL.avgTemp, '--');
                 updateCompostStage(null);
             }
         }
 
+        // Compost stages by exclusive upper bound in tenths of a degree (Optimal
+        // includes 65.0), with their hints
+        const STAGES = [
+            [200, 'Cold', 'Low activity, pile may need more nitrogen and moisture.'],
+            [400, 'Mesophilic', 'Early activity; microbes are ramping up.'],
+            [550, 'Thermophilic', 'Active decomposition; good pathogen reduction.'],
+            [651, 'Optimal', 'Best composting zone for fast breakdown.'],
+            [Infinity, 'Too Hot', 'Turn/aerate pile to cool and protect microbes.']
+        ];
+        let lastStageTenths = null;
+
         function updateCompostStage(avgTemp) {
-            const stageEl = document.getElementById('compostStage');
-            const hintEl = document.getElementById('compostStageHint');
             if (avgTemp === null || Number.isNaN(avgTemp)) {
-                stageEl.textContent = '--';
-                hintEl.textContent = 'Waiting for data';
+                lastStageTenths = null;
+                setText(STATUS_EL.stage, '--');
+                setText(STATUS_EL.hint, 'Waiting for data');
                 return;
             }
 
-            let stage = 'Cold';
-            let hint = 'Low activity, pile may need more nitrogen and moisture.';
-            if (avgTemp >= 20 && avgTemp < 40) {
-                stage = 'Mesophilic';
-                hint = 'Early activity; microbes are ramping up.';
-            } else if (avgTemp >= 40 && avgTemp < 55) {
-                stage = 'Thermophilic';
-                hint = 'Active decomposition; good pathogen reduction.';
-            } else if (avgTemp >= 55 && avgTemp <= 65) {
-                stage = 'Optimal';
-                hint = 'Best composting zone for fast breakdown.';
-            } else if (avgTemp > 65) {
-                stage = 'Too Hot';
-                hint = 'Turn/aerate pile to cool and protect microbes.';
-            }
+            // The stage and hint only depend on the average as displayed
+            const tenths = Math.round(avgTemp * 10);
+            if (tenths === lastStageTenths) return;
+            lastStageTenths = tenths;
 
-            stageEl.textContent = stage;
-            hintEl.textContent = `${hint} (avg ${avgTemp.toFixed(1)}C)`;
+            const [, stage, hint] = STAGES.find(([below]) => tenths < below);
+            setText(STATUS_EL.stage, stage);
+            setText(STATUS_EL.hint, `${hint} (avg ${(tenths / 10).toFixed(1)}C)`);
         }
 
         // UI helpers
+        function setText(el, text) {
+            // Skip the write (and the layout invalidation) when nothing changed
+            if (el.textContent !== text) el.textContent = text;
+        }
+
         function showLoading() {
             // Could add loading indicators here
         }
@@ -1395,14 +1980,32 @@ TEMPLATE = """
         }
 
         // Auto refresh
+        // Poll for new rows every 30 seconds while visible, every 2 minutes while
+        // hidden; the next poll is only scheduled once the previous one finished
+        async function refreshTick() {
+            clearTimeout(refreshTimer);
+            await loadData(false);
+            scheduleRefresh();
+        }
+
+        function scheduleRefresh() {
+            clearTimeout(refreshTimer);
+            if (refreshStopped) return;
+            refreshTimer = setTimeout(refreshTick, document.hidden ? 120000 : 30000);
+        }
+
         function startAutoRefresh() {
-            refreshInterval = setInterval(loadData, 30000); // Refresh every 30 seconds
+            refreshStopped = false;
+            scheduleRefresh();
+            document.addEventListener('visibilitychange', function() {
+                // Catch up straight away when the tab comes back
+                if (!document.hidden && !refreshStopped) refreshTick();
+            });
         }
 
         function stopAutoRefresh() {
-            if (refreshInterval) {
-                clearInterval(refreshInterval);
-            }
+            refreshStopped = true;
+            clearTimeout(refreshTimer);
         }
 
         // Cleanup on page unload
@@ -1419,7 +2022,8 @@ DEBUG_TEMPLATE = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Device Debug</title>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
+    <link rel="preload" as="style" href="{{ asset_urls.font_awesome }}" onload="this.onload=null;this.rel='stylesheet'">
+    <noscript><link href="{{ asset_urls.font_awesome }}" rel="stylesheet"></noscript>
     <style>
         body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; background: #f3f4f6; color: #111827; margin: 0; padding: 24px; }
         .card { max-width: 760px; margin: 0 auto; background: #fff; border-radius: 12px; box-shadow: 0 8px 20px rgba(0,0,0,0.08); padding: 20px; }
@@ -1486,15 +2090,337 @@ DEBUG_TEMPLATE = """
 </html>
 """
 
+# Compiled once at import instead of re-parsing the source on every request
+_DASHBOARD_PAGE = app.jinja_env.from_string(TEMPLATE)
+_DEBUG_PAGE = app.jinja_env.from_string(DEBUG_TEMPLATE)
+
+DATA_WORKER_JS = """
+// Dashboard data worker: fetches /api/data, keeps the charted window, derives
+// the statistics from it, and hands the main thread ready-to-plot typed arrays.
+
+// The window lives in typed arrays grown to the next power of two, so
+// refreshes append and trim in place instead of reallocating
+let length = 0;
+let capacity = 0;
+let tsBuf = new Float64Array(0);
+let t1Buf = new Float32Array(0);
+let t2Buf = new Float32Array(0);
+let t3Buf = new Float32Array(0);
+// Output buffers the main thread has finished with and sent back
+let spare = null;
+// Highest reading id the window includes (X-Last-Id); polls ask for later ids
+let lastId = null;
+// Whether the window came from the server's M4 downsampling (deltas keep it)
+let downsampled = false;
+let work = Promise.resolve();
+// Aborts the fetch in flight when a full reload makes it stale
+let controller = null;
+
+// Put the window back in time order after a delta brought in readings stamped
+// earlier than ones already charted (buffered uploads, device clock skew)
+function sortFrom(start) {
+    let sorted = true;
+    for (let j = Math.max(start, 1); j < length; j++) {
+        if (tsBuf[j] < tsBuf[j - 1]) {
+            sorted = false;
+            break;
+        }
+    }
+    if (sorted) return;
+    const order = Array.from({ length }, (_, j) => j).sort((a, b) => tsBuf[a] - tsBuf[b]);
+    for (const buf of [tsBuf, t1Buf, t2Buf, t3Buf]) {
+        const copy = buf.slice(0, length);
+        order.forEach((from, to) => { buf[to] = copy[from]; });
+    }
+}
+
+function nextPow2(n) {
+    return 2 ** Math.ceil(Math.log2(Math.max(n, 1)));
+}
+
+function grow(buf, size) {
+    const next = new buf.constructor(size);
+    next.set(buf.subarray(0, length));
+    return next;
+}
+
+function ensureCapacity(n) {
+    if (n <= capacity) return;
+    capacity = nextPow2(n);
+    tsBuf = grow(tsBuf, capacity);
+    t1Buf = grow(t1Buf, capacity);
+    t2Buf = grow(t2Buf, capacity);
+    t3Buf = grow(t3Buf, capacity);
+}
+
+function outputBuffers(n) {
+    if (spare && spare.ts.length >= n) {
+        const out = spare;
+        spare = null;
+        return out;
+    }
+    const size = nextPow2(n);
+    return {
+        ts: new Float64Array(size),
+        t1: new Float32Array(size),
+        t2: new Float32Array(size),
+        t3: new Float32Array(size)
+    };
+}
+
+// Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the
+// visual shape of (xs, ys)
+function lttb(xs, ys, threshold) {
+    const n = xs.length;
+    if (threshold >= n || threshold < 3) {
+        return Array.from({ length: n }, (_, i) => i);
+    }
+    const every = (n - 2) / (threshold - 2);
+    const sampled = [0];
+    let a = 0;
+    for (let i = 0; i < threshold - 2; i++) {
+        // Average of the next bucket is the third triangle vertex
+        const avgStart = Math.floor((i + 1) * every) + 1;
+        const avgEnd = Math.min(Math.floor((i + 2) * every) + 1, n);
+        let avgX = 0;
+        let avgY = 0;
+        for (let j = avgStart; j < avgEnd; j++) {
+            avgX += xs[j];
+            avgY += ys[j];
+        }
+        avgX /= avgEnd - avgStart;
+        avgY /= avgEnd - avgStart;
+
+        const rangeStart = Math.floor(i * every) + 1;
+        const rangeEnd = Math.floor((i + 1) * every) + 1;
+        let maxArea = -1;
+        let next = rangeStart;
+        for (let j = rangeStart; j < rangeEnd; j++) {
+            const area = Math.abs((xs[a] - avgX) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avgY - ys[a]));
+            if (area > maxArea) {
+                maxArea = area;
+                next = j;
+            }
+        }
+        sampled.push(next);
+        a = next;
+    }
+    sampled.push(n - 1);
+    return sampled;
+}
+
+// Mean of the sensors that reported at each point, carrying the previous value
+// over rows where none did, so LTTB sees one gap-free series
+function sensorMean() {
+    const ys = new Float64Array(length);
+    let previous = 0;
+    for (let j = 0; j < length; j++) {
+        let sum = 0;
+        let count = 0;
+        for (const v of [t1Buf[j], t2Buf[j], t3Buf[j]]) {
+            if (!Number.isNaN(v)) {
+                sum += v;
+                count++;
+            }
+        }
+        previous = count > 0 ? sum / count : previous;
+        ys[j] = previous;
+    }
+    return ys;
+}
+
+function clock(ms) {
+    const d = new Date(ms);
+    return String(d.getUTCHours()).padStart(2, '0') + ':' + String(d.getUTCMinutes()).padStart(2, '0');
+}
+
+// Per-sensor current/min/max/avg and the overall average in one pass over the
+// window, in the same shape /api/stats returns. Server-side M4 keeps each
+// sensor's extremes and its newest non-NULL reading, so for a freshly loaded
+// window min, max and current agree with /api/stats; averages are taken over
+// the charted rows, and after deltas the window is trimmed relative to the
+// newest reading rather than the current time.
+function windowStats() {
+    const stats = {};
+    let total = 0;
+    let totalCount = 0;
+    [['t1', t1Buf], ['t2', t2Buf], ['t3', t3Buf]].forEach(([sensor, buf]) => {
+        let sum = 0;
+        let count = 0;
+        let min = Infinity;
+        let max = -Infinity;
+        let minAt = 0;
+        let maxAt = 0;
+        let current = null;
+        for (let j = 0; j < length; j++) {
+            const v = buf[j];
+            if (Number.isNaN(v)) continue;
+            sum += v;
+            count++;
+            if (v < min) {
+                min = v;
+                minAt = j;
+            }
+            if (v > max) {
+                max = v;
+                maxAt = j;
+            }
+            current = v;
+        }
+        total += sum;
+        totalCount += count;
+        stats[sensor] = count === 0 ? null : {
+            min: { val: min, time: clock(tsBuf[minAt]) },
+            max: { val: max, time: clock(tsBuf[maxAt]) },
+            avg: Math.round(sum / count * 100) / 100,
+            current
+        };
+    });
+    return { stats, avg: totalCount > 0 ? total / totalCount : null };
+}
+
+async function load({ id, hours, points, threshold, full }, signal) {
+    const reload = full || lastId === null;
+    const dataUrl = reload
+        ? `/api/data?hours=${hours}&points=${points}`
+        : `/api/data?since_id=${lastId}`;
+    const response = await fetch(dataUrl, {
+        signal,
+        headers: { 'Accept': 'application/octet-stream' }
+    });
+    if (!response.ok) {
+        throw new Error('Failed to fetch data');
+    }
+    // Columnar rows, oldest first: ts_ms f64[N] | t1 f32[N] | t2 f32[N] | t3 f32[N]
+    const body = await response.arrayBuffer();
+    const rows = body.byteLength / 20;
+
+    if (reload) {
+        length = 0;
+        downsampled = response.headers.get('X-Downsampled') === 'm4';
+    }
+    const header = response.headers.get('X-Last-Id');
+    lastId = header === null ? null : Number(header);
+    const start = length;
+    ensureCapacity(length + rows);
+    tsBuf.set(new Float64Array(body, 0, rows), length);
+    t1Buf.set(new Float32Array(body, 8 * rows, rows), length);
+    t2Buf.set(new Float32Array(body, 12 * rows, rows), length);
+    t3Buf.set(new Float32Array(body, 16 * rows, rows), length);
+    length += rows;
+    sortFrom(start);
+
+    // Drop points that have slid out of the selected window
+    const windowStart = tsBuf[length - 1] - hours * 3600000;
+    let overflow = 0;
+    while (overflow < length && tsBuf[overflow] < windowStart) overflow++;
+    if (overflow > 0) {
+        for (const buf of [tsBuf, t1Buf, t2Buf, t3Buf]) buf.copyWithin(0, overflow, length);
+        length -= overflow;
+    }
+
+    const { stats, avg } = windowStats();
+
+    let out;
+    let n;
+    if (!downsampled && length > threshold) {
+        // The server sent raw rows: reduce with LTTB, picking indices once so
+        // all three sensors stay aligned. M4 output is left alone so its
+        // per-bucket extremes survive.
+        const keep = lttb(tsBuf.subarray(0, length), sensorMean(), threshold);
+        n = keep.length;
+        out = outputBuffers(n);
+        keep.forEach((j, i) => {
+            out.ts[i] = tsBuf[j];
+            out.t1[i] = t1Buf[j];
+            out.t2[i] = t2Buf[j];
+            out.t3[i] = t3Buf[j];
+        });
+    } else {
+        n = length;
+        out = outputBuffers(n);
+        out.ts.set(tsBuf.subarray(0, n));
+        out.t1.set(t1Buf.subarray(0, n));
+        out.t2.set(t2Buf.subarray(0, n));
+        out.t3.set(t3Buf.subarray(0, n));
+    }
+    self.postMessage({
+        id,
+        length: n,
+        ts: out.ts, t1: out.t1, t2: out.t2, t3: out.t3,
+        avg,
+        stats
+    }, [out.ts.buffer, out.t1.buffer, out.t2.buffer, out.t3.buffer]);
+}
+
+self.onmessage = function(event) {
+    if (event.data.recycle) {
+        spare = event.data.recycle;
+        return;
+    }
+    // One request at a time so deltas always apply to the latest window. The
+    // window only changes after a fetch completes, so an aborted load leaves
+    // it intact.
+    const request = event.data;
+    if (request.full && controller) controller.abort();
+    work = work.then(() => {
+        controller = new AbortController();
+        return load(request, controller.signal);
+    }).catch(error => {
+        if (error.name === 'AbortError') {
+            self.postMessage({ id: request.id, aborted: true });
+        } else {
+            self.postMessage({ id: request.id, error: error.message });
+        }
+    });
+};
+"""
+
+def _precompressed(text):
+    """Encode a fixed response body once, alongside its gzip form"""
+    body = text.encode("utf-8")
+    return body, gzip.compress(body, compresslevel=9, mtime=0)
+
+# The pages take no per-request values, so they are rendered and compressed once
+_DASHBOARD_BODY = _precompressed(_DASHBOARD_PAGE.render(asset_urls=ASSET_URLS))
+_DEBUG_BODY = _precompressed(_DEBUG_PAGE.render(asset_urls=ASSET_URLS))
+_DATA_WORKER_BODY = _precompressed(DATA_WORKER_JS)
+
+def _send_precompressed(bodies, mimetype):
+    """Send the gzip body when the client accepts it; private since these sit behind auth"""
+    plain, gzipped = bodies
+    if request.accept_encodings["gzip"]:
+        response = app.response_class(gzipped, mimetype=mimetype)
+        response.content_encoding = "gzip"
+    else:
+        response = app.response_class(plain, mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.private = True
+    response.cache_control.max_age = 300
+    return response
+
 @app.route("/")
 @require_auth
 def index():
-    return render_template_string(TEMPLATE)
+    return _send_precompressed(_DASHBOARD_BODY, "text/html")
 
 @app.route("/debug-view")
 @require_auth
 def debug_view():
-    return render_template_string(DEBUG_TEMPLATE)
+    return _send_precompressed(_DEBUG_BODY, "text/html")
+
+@app.route("/data-worker.js")
+@require_auth
+def data_worker():
+    return _send_precompressed(_DATA_WORKER_BODY, "text/javascript")
+
+@app.route("/static/vendor/<digest>/<path:filename>")
+def vendor_asset(digest, filename):
+    """Serve vendored front-end assets; the digest in the URL makes them immutable"""
+    response = send_from_directory(VENDOR_DIR, filename, max_age=31536000)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 if __name__ == "__main__":
     # Migrate existing JSON data to database
@@ -1506,17 +2432,15 @@ if __name__ == "__main__":
                     try:
                         with open(filepath, 'r') as f:
                             data = json.load(f)
-                            for entry in data:
-                                data_manager.add_reading(
-                                    entry.get('t1'),
-                                    entry.get('t2'),
-                                    entry.get('t3'),
-                                    entry.get('battery'),
-                                    entry.get('battery_status')
-                                )
-                        print(f"Migrated data from {filename}")
+                        # One transaction per file instead of one commit per entry
+                        data_manager.bulk_insert([
+                            (entry.get('t1'), entry.get('t2'), entry.get('t3'),
+                             entry.get('battery'), entry.get('battery_status'))
+                            for entry in data
+                        ])
+                        logger.info("Migrated data from %s", filename)
                     except Exception as e:
-                        print(f"Error migrating {filename}: {e}")
+                        logger.error("Error migrating %s: %s", filename, e)
 
     # Run migration in background
     migration_thread = threading.Thread(target=migrate_json_data)